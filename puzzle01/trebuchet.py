@@ -1,3 +1,6 @@
+import os
+from multiprocessing import Pool
+
 
 DIGIT_STRING_TO_INT = {
     "one": "1",
@@ -12,14 +15,94 @@ DIGIT_STRING_TO_INT = {
 }
 
 
-def sum_calibration_values(calibration_strings: list[str]) -> int:
+class DigitAutomaton:
+    """
+    Aho-Corasick automaton over a vocabulary of digit tokens (e.g. "1" or "one"). The automaton
+    is compiled once into a complete transition table so that a line can be scanned left to right
+    in a single pass, reporting the first and last digit token without modifying the line
+    """
+
+    def __init__(self, token_to_digit: dict[str, str]) -> None:
+        """
+        Builds the trie of all tokens, computes the failure links breadth first and
+        resolves them into a complete transition table
+
+        :param token_to_digit: mapping from each token to the digit it represents
+        """
+        self.transitions: list[dict[str, int]] = [{}]
+        # every state keeps all (token length, digit) pairs that end in it, including
+        # the ones inherited through its failure link
+        self.outputs: list[list[tuple[int, str]]] = [[]]
+
+        for token, digit in token_to_digit.items():
+            state = 0
+            for char in token:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append([])
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state].append((len(token), digit))
+
+        alphabet = {char for token in token_to_digit for char in token}
+        fail = [0] * len(self.transitions)
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for char in alphabet:
+                if char in self.transitions[state]:
+                    child = self.transitions[state][char]
+                    fail[child] = self.transitions[fail[state]].get(char, 0) \
+                        if state != 0 else 0
+                    self.outputs[child] = self.outputs[child] + \
+                        self.outputs[fail[child]]
+                    queue.append(child)
+                elif state != 0:
+                    self.transitions[state][char] = self.transitions[fail[state]].get(
+                        char, 0)
+
+    def find_first_and_last_digit(self, line: str) -> tuple[str, str]:
+        """
+        Scans a line once and returns the digit of the token starting first and
+        the digit of the token starting last (overlapping tokens like eighthree are both found)
+
+        :param line: the calibration string to scan
+        :return: tuple of first and last digit found in the line
+        """
+        transitions = self.transitions
+        outputs = self.outputs
+        state = 0
+        first_start = len(line)
+        last_start = -1
+        first_digit = last_digit = ""
+        for idx, char in enumerate(line):
+            state = transitions[state].get(char, 0)
+            for token_length, digit in outputs[state]:
+                start = idx - token_length + 1
+                if start < first_start:
+                    first_start, first_digit = start, digit
+                if start > last_start:
+                    last_start, last_digit = start, digit
+
+        return first_digit, last_digit
+
+
+SPELLED_DIGIT_AUTOMATON = DigitAutomaton(
+    DIGIT_STRING_TO_INT | {str(digit): str(digit) for digit in range(10)})
+
+
+def sum_calibration_values(calibration_strings: list[str], spelled_digits: bool = False) -> int:
     """
     Extracts calibration value from each line in a list of calibration document strings
     and sums these values
 
     :param calibration_strings: the list of calibration strings
+    :param spelled_digits: if set, spelled out digits (e.g. one) also count as digits. The lines
+    are then scanned in a single pass with the SPELLED_DIGIT_AUTOMATON instead of being rewritten
     :return: sum of all calibration values extracted from the strings
     """
+    if spelled_digits:
+        return sum_calibration_values_with_automaton(calibration_strings, SPELLED_DIGIT_AUTOMATON)
+
     sum = 0
     for line in calibration_strings:
         extracted_digits = [x for x in line if x.isdigit()]
@@ -29,23 +112,84 @@ def sum_calibration_values(calibration_strings: list[str]) -> int:
     return sum
 
 
-def replace_digit_strings(calibration_strings: list[str]) -> None:
+def sum_calibration_values_with_automaton(calibration_strings: list[str], automaton: DigitAutomaton) -> int:
     """
-    Iterates through list of calibration strings and replaces the second index of a string 
-    of a digit with its actual digit (e.g. one -> o1e). This is done so that e.g. eighthree
-    will yield both digits 8 and 3
+    Extracts calibration value from each line using the first and last digit token the automaton
+    finds and sums these values
 
     :param calibration_strings: the list of calibration strings
+    :param automaton: the automaton recognizing the digit tokens
+    :return: sum of all calibration values extracted from the strings
+    """
+    sum = 0
+    for line in calibration_strings:
+        first_digit, last_digit = automaton.find_first_and_last_digit(line)
+        sum += int(first_digit + last_digit)
+
+    return sum
+
+
+def find_chunk_boundaries(path: str, chunk_size: int) -> list[tuple[int, int]]:
+    """
+    Splits a file into byte ranges of roughly chunk_size bytes. Every range is extended
+    to the end of the line it would otherwise cut, so that no line is split between two chunks
+
+    :param path: path of the calibration document
+    :param chunk_size: the minimum number of bytes per chunk (the last chunk may be smaller)
+    :return: list of (start, end) byte offsets of the chunks
     """
+    file_size = os.path.getsize(path)
+    boundaries = []
+    with open(path, "rb") as fp:
+        start = 0
+        while start < file_size:
+            fp.seek(min(start + chunk_size, file_size) - 1)
+            fp.readline()
+            end = min(fp.tell(), file_size)
+            boundaries.append((start, end))
+            start = end
+
+    return boundaries
 
-    for i, line in enumerate(calibration_strings):
-        for digit_string in DIGIT_STRING_TO_INT.keys():
-            while second_indx := line.find(digit_string)+1:
-                if second_indx == 0:
-                    break
-                line = line[:second_indx] + \
-                    DIGIT_STRING_TO_INT[digit_string] + line[second_indx + 1:]
-        calibration_strings[i] = line
+
+def sum_calibration_values_of_chunk(path: str, start: int, end: int) -> tuple[int, int]:
+    """
+    Reads the lines of one chunk of a calibration document and computes the summed
+    calibration values of this chunk for both parts
+
+    :param path: path of the calibration document
+    :param start: byte offset of the first line of the chunk
+    :param end: byte offset right after the last line of the chunk
+    :return: tuple of the part 1 and part 2 partial sums of this chunk
+    """
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        calibration_strings = [line for line in fp.read(
+            end - start).decode().splitlines() if line]
+
+    return sum_calibration_values(calibration_strings), sum_calibration_values(calibration_strings, spelled_digits=True)
+
+
+def sum_calibration_values_parallel(path: str, chunk_size: int = 1 << 24, num_processes: int | None = None) -> tuple[int, int]:
+    """
+    Sums the calibration values of a calibration document for both parts by letting a process
+    pool work on newline aligned chunks of the file. Only one chunk per process is held in memory
+    at a time
+
+    :param path: path of the calibration document
+    :param chunk_size: the number of bytes each process reads at once
+    :param num_processes: the number of worker processes (defaults to the number of cores)
+    :return: tuple of the part 1 and part 2 result
+    """
+    chunks = [(path, start, end)
+              for start, end in find_chunk_boundaries(path, chunk_size)]
+    summed_part1 = summed_part2 = 0
+    with Pool(num_processes) as pool:
+        for partial_part1, partial_part2 in pool.starmap(sum_calibration_values_of_chunk, chunks, chunksize=1):
+            summed_part1 += partial_part1
+            summed_part2 += partial_part2
+
+    return summed_part1, summed_part2
 
 
 if __name__ == "__main__":
@@ -54,7 +198,11 @@ if __name__ == "__main__":
         calibration_strings = fp.readlines()
         summed_calibration = sum_calibration_values(calibration_strings)
         print(f"Part1 result: {summed_calibration}")
-        replace_digit_strings(calibration_strings)
         summed_calibration_after_replace = sum_calibration_values(
-            calibration_strings)
+            calibration_strings, spelled_digits=True)
         print(f"Part2 result: {summed_calibration_after_replace}")
+
+    summed_part1, summed_part2 = sum_calibration_values_parallel(
+        "input.txt", chunk_size=4096)
+    print(f"Part1 result (parallel): {summed_part1}")
+    print(f"Part2 result (parallel): {summed_part2}")
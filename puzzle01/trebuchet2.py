@@ -1,3 +1,5 @@
+import mmap
+
 import numpy as np
 
 DIGIT_STRING_TO_INT = {
@@ -24,6 +26,9 @@ DIGIT_STRING_TO_INT_REVERSED = {
     "enin": "9",
 }
 
+# marks bytes at which no digit starts, as 0 is a valid digit
+NO_DIGIT = 255
+
 
 def sum_calibration_values(calibration_strings: list[str]) -> int:
     """
@@ -74,6 +79,126 @@ def replace_digit_strings(calibration_strings: list[str]) -> None:
                                                                                                               1: last_idx_string] + DIGIT_STRING_TO_INT_REVERSED[last_digit_string] + line[last_idx_string + 1:]
 
 
+def digit_values_per_byte(window: np.ndarray, num_starts: int, spelled_digits: bool,
+                          values: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """
+    Computes for the first num_starts bytes of a window of a calibration document the digit that
+    starts at this byte (NO_DIGIT if there is none). Spelled out digits are found by comparing shifted
+    views of the window against each letter of the digit string, so the window has to extend
+    past num_starts by the length of the longest digit string - 1 (or end with the document)
+
+    :param window: uint8 view of a part of the calibration document
+    :param num_starts: the number of leading bytes of the window to compute the digits for
+    :param spelled_digits: whether spelled out digits (e.g. one) also count as digits
+    :param values: reusable uint8 output buffer with at least num_starts entries
+    :param scratch: reusable bool buffer with at least 2 * num_starts entries
+    :return: view of values holding the digit starting at each of the num_starts bytes
+    """
+    values = values[:num_starts]
+    char_scratch, matches = scratch[:num_starts], scratch[len(scratch) // 2:len(scratch) // 2 + num_starts]
+    # bytes below "0" wrap around in uint8, so every non digit byte ends up above 9
+    np.subtract(window[:num_starts], ord("0"), out=values)
+    np.greater(values, 9, out=matches)
+    np.copyto(values, NO_DIGIT, where=matches)
+
+    if spelled_digits:
+        for digit_string, digit in DIGIT_STRING_TO_INT.items():
+            # a digit string cannot start at bytes too close to the end of the document
+            num_word_starts = min(num_starts, len(window) - len(digit_string) + 1)
+            if num_word_starts <= 0:
+                continue
+            word_matches, char_matches = matches[:num_word_starts], char_scratch[:num_word_starts]
+            np.equal(window[:num_word_starts], ord(digit_string[0]), out=word_matches)
+            for offset, char in enumerate(digit_string[1:], start=1):
+                np.equal(window[offset:offset + num_word_starts], ord(char), out=char_matches)
+                np.logical_and(word_matches, char_matches, out=word_matches)
+            values[:num_word_starts][word_matches] = int(digit)
+
+    return values
+
+
+def sum_calibration_values_of_buffer(buffer: np.ndarray, spelled_digits: bool = False, block_size: int = 1 << 22) -> int:
+    """
+    Sums the calibration values of all lines of a calibration document using array operations
+    on fixed size blocks, so that memory is bounded by the block size and not the document size.
+    Each block is extended by the length of the longest digit string - 1 bytes, so that digit
+    strings starting in the block are found. Inside a block each digit is assigned to its line by
+    searching its position in the newline positions, the first and last digit of a line are where
+    this line id changes. The first and last digit of the line that continues into the next block
+    are carried over
+
+    :param buffer: uint8 view of the whole calibration document
+    :param spelled_digits: whether spelled out digits (e.g. one) also count as digits
+    :param block_size: the number of bytes processed at once
+    :return: sum of all calibration values of the document
+    """
+    overlap = max(len(digit_string) for digit_string in DIGIT_STRING_TO_INT) - 1 if spelled_digits else 0
+    values = np.empty(block_size, dtype=np.uint8)
+    scratch = np.empty(2 * block_size, dtype=bool)
+
+    summed_calibration = 0
+    open_first_digit = open_last_digit = None
+    for block_start in range(0, len(buffer), block_size):
+        block_end = min(block_start + block_size, len(buffer))
+        window = buffer[block_start:block_end + overlap]
+        block_values = digit_values_per_byte(window, block_end - block_start, spelled_digits, values, scratch)
+
+        # line id 0 continues the open line of the previous block, line id num_newlines is
+        # still open at the end of this block
+        digit_positions = np.flatnonzero(block_values != NO_DIGIT).astype(np.int32)
+        newline_positions = np.flatnonzero(window[:block_end - block_start] == ord("\n")).astype(np.int32)
+        num_newlines = len(newline_positions)
+        line_ids = np.searchsorted(newline_positions, digit_positions).astype(np.int32)
+        line_changes = line_ids[1:] != line_ids[:-1]
+        is_first_of_line = np.r_[True, line_changes] if len(line_ids) else np.zeros(0, dtype=bool)
+        is_last_of_line = np.r_[line_changes, True] if len(line_ids) else np.zeros(0, dtype=bool)
+        digit_line_ids = line_ids[is_first_of_line]
+        first_digits = block_values[digit_positions[is_first_of_line]].astype(np.int64)
+        last_digits = block_values[digit_positions[is_last_of_line]].astype(np.int64)
+
+        is_closed_line = (digit_line_ids > 0) & (digit_line_ids < num_newlines)
+        summed_calibration += int(10 * first_digits[is_closed_line].sum() + last_digits[is_closed_line].sum())
+
+        if len(digit_line_ids) and digit_line_ids[0] == 0:
+            if open_first_digit is None:
+                open_first_digit = int(first_digits[0])
+            open_last_digit = int(last_digits[0])
+        if num_newlines > 0:
+            if open_first_digit is not None:
+                summed_calibration += 10 * open_first_digit + open_last_digit
+            open_first_digit = open_last_digit = None
+            if len(digit_line_ids) and digit_line_ids[-1] == num_newlines:
+                open_first_digit, open_last_digit = int(first_digits[-1]), int(last_digits[-1])
+
+    if open_first_digit is not None:
+        summed_calibration += 10 * open_first_digit + open_last_digit
+
+    return summed_calibration
+
+
+def sum_calibration_values_of_file(path: str, spelled_digits: bool = False) -> int:
+    """
+    Memory maps a calibration document and sums its calibration values without
+    creating a python string per line
+
+    :param path: path of the calibration document
+    :param spelled_digits: whether spelled out digits (e.g. one) also count as digits
+    :return: sum of all calibration values of the document
+    """
+    with open(path, "rb") as fp:
+        fp.seek(0, 2)
+        if fp.tell() == 0:
+            return 0
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            buffer = np.frombuffer(mapped_file, dtype=np.uint8)
+            summed_calibration = sum_calibration_values_of_buffer(
+                buffer, spelled_digits)
+            # the view has to be released before the mapping can be closed
+            del buffer
+
+    return summed_calibration
+
+
 if __name__ == "__main__":
     sum = 0
     with open("input.txt") as fp:
@@ -84,3 +209,8 @@ if __name__ == "__main__":
         summed_calibration_after_replace = sum_calibration_values(
             calibration_strings)
         print(f"Part2 result: {summed_calibration_after_replace}")
+
+    print(
+        f"Part1 result (memory mapped): {sum_calibration_values_of_file('input.txt')}")
+    print(
+        f"Part2 result (memory mapped): {sum_calibration_values_of_file('input.txt', spelled_digits=True)}")
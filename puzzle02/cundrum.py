@@ -1,5 +1,9 @@
+import math
+
 import numpy as np
 
+COLORS = ("red", "green", "blue")
+
 
 def load_games(game_strings: list[str]) -> list[tuple[int, dict[str, list]]]:
     """
@@ -79,6 +83,121 @@ def sum_min_needed_cubes(games: list[tuple[int, dict[str, list]]]) -> int:
 
     return sum
 
+def load_game_columns(game_strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parses all game strings in a single pass into a columnar representation: an array of the
+    game indices and a parallel (num_games, 3) array that holds the maximum amount of cubes drawn
+    per color (in the order of COLORS) in each game
+
+    :param game_strings: contains all game strings read from the input file
+    :return: tuple of the game index array and the color maxima array
+    """
+
+    color_to_column = {color: column for column, color in enumerate(COLORS)}
+    game_ids = np.empty(len(game_strings), dtype=np.int64)
+    color_maxima = np.zeros((len(game_strings), len(COLORS)), dtype=np.int64)
+
+    num_games = 0
+    for line in game_strings:
+        if not line.strip():
+            continue
+        game_idx, game_sets = line.split(":")
+        game_ids[num_games] = int(game_idx.split(" ")[1])
+        game_maxima = color_maxima[num_games]
+        # the sets of a game do not need to be distinguished for the maxima, so
+        # all draws are split at once
+        for color_string in game_sets.replace(";", ",").split(","):
+            amount, color = color_string.split()
+            column = color_to_column[color]
+            game_maxima[column] = max(game_maxima[column], int(amount))
+        num_games += 1
+
+    return game_ids[:num_games], color_maxima[:num_games]
+
+def sum_possible_games_for_budgets(game_ids: np.ndarray, color_maxima: np.ndarray, budgets: np.ndarray,
+                                   max_block_size: int = 1 << 24) -> np.ndarray:
+    """
+    Evaluates many cube budgets at once and returns for each budget the sum of the indices
+    of all games that are possible with it. The budgets are processed in blocks so that the
+    (budgets, games) possibility matrix never exceeds max_block_size entries
+
+    :param game_ids: array of the game indices
+    :param color_maxima: (num_games, 3) array of the maximum cubes drawn per color in each game
+    :param budgets: (num_budgets, 3) array of the cubes available per color (in the order of COLORS)
+    :param max_block_size: upper bound for the number of entries of one possibility matrix block
+    :return: array with the sum of possible game indices per budget
+    """
+
+    budgets = np.atleast_2d(budgets)
+    sums = np.zeros(len(budgets), dtype=np.int64)
+    block_length = max(1, max_block_size // max(1, len(game_ids)))
+    for block_start in range(0, len(budgets), block_length):
+        block = budgets[block_start:block_start + block_length]
+        is_possible = np.all(
+            color_maxima[np.newaxis, :, :] <= block[:, np.newaxis, :], axis=2)
+        sums[block_start:block_start + block_length] = is_possible @ game_ids
+
+    return sums
+
+class DominanceIndex:
+    """
+    Prebuilt index over the per game color maxima that answers "sum of the indices of all games
+    possible with budget (r, g, b)" without scanning the games. The maxima of each color are
+    compressed to their sorted distinct values and the game indices are accumulated into a 3D
+    prefix sum table over these compressed coordinates. A query is then one binary search per
+    color followed by a single table lookup
+    """
+
+    def __init__(self, game_ids: np.ndarray, color_maxima: np.ndarray, max_table_size: int = 1 << 24) -> None:
+        """
+        Builds the compressed axes and the prefix sum table. The table has one cell per combination
+        of distinct maxima of all colors, if that exceeds max_table_size no table is built and
+        queries fall back to sum_possible_games_for_budgets
+
+        :param game_ids: array of the game indices
+        :param color_maxima: (num_games, 3) array of the maximum cubes drawn per color in each game
+        :param max_table_size: the maximum number of int64 cells of the prefix sum table
+        """
+        self.game_ids = game_ids
+        self.color_maxima = color_maxima
+        self.axes = [np.unique(color_maxima[:, column])
+                     for column in range(len(COLORS))]
+        self.prefix_sums = None
+        if math.prod(len(axis) for axis in self.axes) > max_table_size:
+            return
+
+        coordinates = tuple(np.searchsorted(axis, color_maxima[:, column])
+                            for column, axis in enumerate(self.axes))
+
+        self.prefix_sums = np.zeros(
+            tuple(len(axis) for axis in self.axes), dtype=np.int64)
+        np.add.at(self.prefix_sums, coordinates, game_ids)
+        for dimension in range(len(COLORS)):
+            np.cumsum(self.prefix_sums, axis=dimension, out=self.prefix_sums)
+
+    def sum_possible_games(self, budgets: np.ndarray) -> np.ndarray:
+        """
+        Answers the sum of possible game indices for each budget in O(log num_games),
+        or with a scan over all games if the prefix sum table would have been too large
+
+        :param budgets: (num_budgets, 3) array of the cubes available per color (in the order of COLORS)
+        :return: array with the sum of possible game indices per budget
+        """
+        budgets = np.atleast_2d(budgets)
+        if self.prefix_sums is None:
+            return sum_possible_games_for_budgets(self.game_ids, self.color_maxima, budgets)
+
+        # index of the largest compressed value that still fits into the budget, -1 if none fits
+        coordinates = [np.searchsorted(axis, budgets[:, column], side="right") - 1
+                       for column, axis in enumerate(self.axes)]
+        has_possible_games = np.all(np.stack(coordinates) >= 0, axis=0)
+
+        sums = np.zeros(len(budgets), dtype=np.int64)
+        sums[has_possible_games] = self.prefix_sums[tuple(
+            coordinate[has_possible_games] for coordinate in coordinates)]
+
+        return sums
+
 if __name__ == "__main__":
     available_cubes = {"red": 12, "green": 13, "blue": 14}
 
@@ -89,3 +208,11 @@ if __name__ == "__main__":
             games, available_cubes)
         print(f"Part 1 result: {sum_possible_games_idx}")
         print(f"Part 2 result: {sum_min_needed_cubes(games)}")
+
+        game_ids, color_maxima = load_game_columns(game_strings)
+        budget = np.array([[available_cubes[color] for color in COLORS]])
+        print(
+            f"Part 1 result (columnar): {sum_possible_games_for_budgets(game_ids, color_maxima, budget)[0]}")
+        dominance_index = DominanceIndex(game_ids, color_maxima)
+        print(
+            f"Part 1 result (dominance index): {dominance_index.sum_possible_games(budget)[0]}")
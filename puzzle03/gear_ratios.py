@@ -1,3 +1,5 @@
+from collections.abc import Iterable, Iterator
+
 import numpy as np
 
 
@@ -132,6 +134,111 @@ def sum_over_row_gear_ratios(start_row: Row) -> int:
 
     return sum        
 
+def stream_row_contributions(row_strings: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """
+    Streams over the rows of a schematic keeping only the previous, current and next Row
+    in memory. For every row yields the sum of its valid numbers and its gear ratio as soon as
+    the row below is known, so memory does not grow with the height of the schematic
+    """
+    previous_row = None
+    current_row = None
+    for row_string in row_strings:
+        next_row = Row(row_string)
+        if current_row:
+            current_row.next_row = next_row
+            next_row.previous_row = current_row
+            yield current_row.sum_valid_numbers_of_row(), current_row.calculate_gear_ratio()
+            # unlink the row that is no longer needed so it can be freed
+            current_row.previous_row = None
+            if previous_row:
+                previous_row.next_row = None
+        previous_row, current_row = current_row, next_row
+
+    if current_row:
+        yield current_row.sum_valid_numbers_of_row(), current_row.calculate_gear_ratio()
+
+def sum_streamed_rows(row_strings: Iterable[str]) -> tuple[int, int]:
+    """
+    Returns the sum of all valid numbers and the sum of all gear ratios of a streamed schematic
+    """
+    sum_valid_numbers = 0
+    sum_gear_ratios = 0
+    for valid_numbers, gear_ratio in stream_row_contributions(row_strings):
+        sum_valid_numbers += valid_numbers
+        sum_gear_ratios += gear_ratio
+
+    return sum_valid_numbers, sum_gear_ratios
+
+def load_schematic_grid(path: str) -> np.ndarray:
+    """
+    Loads the schematic as a 2D uint8 array of its bytes, padded with a border of "."
+    so that every tile has 8 neighbors
+    """
+    with open(path, "rb") as fp:
+        lines = fp.read().split()
+    grid = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(len(lines), -1)
+
+    return np.pad(grid, 1, constant_values=ord("."))
+
+def label_numbers(grid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Labels every run of digits in the grid with a number id.
+    Returns a grid of the same shape that holds the number id of each tile (-1 for tiles that
+    are no digit) and an array holding the value of each number id
+    """
+    is_digit = (grid >= ord("0")) & (grid <= ord("9"))
+    # runs cannot continue over the row end since the grid is padded with "."
+    flat_is_digit = is_digit.ravel()
+    run_starts = flat_is_digit & ~np.r_[False, flat_is_digit[:-1]]
+    run_ends = np.flatnonzero(flat_is_digit & ~np.r_[flat_is_digit[1:], False])
+    number_ids = np.where(flat_is_digit, np.cumsum(run_starts) - 1, -1)
+
+    digit_positions = np.flatnonzero(flat_is_digit)
+    digit_ids = number_ids[digit_positions]
+    place_values = 10 ** (run_ends[digit_ids] - digit_positions)
+    number_values = np.zeros(len(run_ends), dtype=np.int64)
+    np.add.at(number_values, digit_ids,
+              (grid.ravel()[digit_positions] - ord("0")) * place_values)
+
+    return number_ids.reshape(grid.shape), number_values
+
+def neighborhood_stack(grid: np.ndarray) -> np.ndarray:
+    """
+    Returns a (9, height-2, width-2) array holding for every inner tile of a padded grid
+    the values of itself and its 8 neighbors
+    """
+    height, width = grid.shape
+    return np.stack([grid[row_shift:height-2+row_shift, col_shift:width-2+col_shift]
+                     for row_shift in range(3) for col_shift in range(3)])
+
+def sum_valid_numbers_of_grid(grid: np.ndarray, number_ids: np.ndarray, number_values: np.ndarray) -> int:
+    """
+    Returns the sum of all numbers adjacent to a symbol by dilating the symbol mask over the
+    8-neighborhood and collecting the number ids under the dilated mask
+    """
+    is_symbol = np.isin(grid, np.frombuffer("".join(SYMBOLS).encode(), dtype=np.uint8))
+    near_symbol = np.pad(neighborhood_stack(is_symbol).any(axis=0), 1)
+    valid_ids = np.unique(number_ids[near_symbol & (number_ids >= 0)])
+
+    return int(number_values[valid_ids].sum())
+
+def sum_gear_ratios_of_grid(grid: np.ndarray, number_ids: np.ndarray, number_values: np.ndarray) -> int:
+    """
+    Returns the sum of all gear ratios by counting the distinct number ids in the
+    8-neighborhood of every "*" and multiplying the two numbers of stars that have exactly two
+    """
+    star_rows, star_cols = np.nonzero(grid[1:-1, 1:-1] == ord("*"))
+    adjacent_ids = np.sort(neighborhood_stack(number_ids)[:, star_rows, star_cols].T, axis=1)
+
+    is_new_id = np.c_[adjacent_ids[:, :1] >= 0,
+                      (adjacent_ids[:, 1:] != adjacent_ids[:, :-1]) & (adjacent_ids[:, 1:] >= 0)]
+    is_gear = is_new_id.sum(axis=1) == 2
+    gear_ids = adjacent_ids[is_gear]
+    smallest_ids = np.where(gear_ids >= 0, gear_ids, len(number_values)).min(axis=1)
+    largest_ids = gear_ids.max(axis=1)
+
+    return int((number_values[smallest_ids] * number_values[largest_ids]).sum())
+
 if __name__ == "__main__":
     with open("input.txt") as fp:
         first_line = fp.readline()
@@ -146,3 +253,13 @@ if __name__ == "__main__":
 
     print(f"Result Part 1: {sum_over_valid_row_numbers(first_row)}")
     print(f"Result Part 2: {sum_over_row_gear_ratios(first_row)}")
+
+    with open("input.txt") as fp:
+        sum_valid_numbers, sum_gear_ratios = sum_streamed_rows(fp)
+    print(f"Result Part 1 (streamed): {sum_valid_numbers}")
+    print(f"Result Part 2 (streamed): {sum_gear_ratios}")
+
+    grid = load_schematic_grid("input.txt")
+    number_ids, number_values = label_numbers(grid)
+    print(f"Result Part 1 (grid): {sum_valid_numbers_of_grid(grid, number_ids, number_values)}")
+    print(f"Result Part 2 (grid): {sum_gear_ratios_of_grid(grid, number_ids, number_values)}")
@@ -1,3 +1,5 @@
+from collections.abc import Iterable, Iterator
+
 import numpy as np
 
 class Scratchcard(): 
@@ -13,6 +15,96 @@ class Scratchcard():
         num_intersects = len(np.intersect1d(self.winning_numbers, self.drawn_numbers))
         return  num_intersects, int(2**(num_intersects-1))
 
+def load_scratchcard_matrices(card_strings: list[str]) -> (np.ndarray, np.ndarray):
+    """
+    Parses all cards at once into a (num_cards, num_winning) matrix of winning numbers
+    and a (num_cards, num_drawn) matrix of drawn numbers
+    """
+    winning_strings, drawn_strings = zip(*(card_string.split(":")[1].split("|")
+                                           for card_string in card_strings if card_string.strip()))
+    winning_numbers = np.array(" ".join(winning_strings).split(), dtype=np.int64)
+    drawn_numbers = np.array(" ".join(drawn_strings).split(), dtype=np.int64)
+
+    num_cards = len(winning_strings)
+    return winning_numbers.reshape(num_cards, -1), drawn_numbers.reshape(num_cards, -1)
+
+def calculate_num_winnings_of_cards(winning_numbers: np.ndarray, drawn_numbers: np.ndarray) -> np.ndarray:
+    """
+    Returns the count of winning numbers of every card. Since the numbers come from a small
+    domain, a membership mask over this domain is filled for the winning and the drawn numbers
+    of each card and the overlap of both masks is counted
+    """
+    num_cards = len(winning_numbers)
+    domain_size = int(max(winning_numbers.max(initial=0), drawn_numbers.max(initial=0))) + 1
+    card_rows = np.arange(num_cards)[:, np.newaxis]
+
+    is_winning = np.zeros((num_cards, domain_size), dtype=bool)
+    is_winning[card_rows, winning_numbers] = True
+    is_drawn = np.zeros((num_cards, domain_size), dtype=bool)
+    is_drawn[card_rows, drawn_numbers] = True
+
+    return np.count_nonzero(is_winning & is_drawn, axis=1)
+
+def calculate_points_of_cards(num_winnings: np.ndarray) -> np.ndarray:
+    """
+    Returns the points every card is worth given its count of winning numbers
+    """
+    return np.where(num_winnings > 0, np.left_shift(1, np.maximum(num_winnings - 1, 0)), 0)
+
+def calculate_total_cards(num_winnings: np.ndarray) -> int:
+    """
+    Returns the total number of cards including all won copies. The copies won by a card are
+    added to a difference array at the start and subtracted right after the end of the range of
+    cards it wins, a running sum over this array then gives the copies of the current card
+    """
+    num_cards = len(num_winnings)
+    copies_difference = [0] * (num_cards + 1)
+    copies = 0
+    total_cards = 0
+    for card_idx, num_winning in enumerate(num_winnings.tolist()):
+        copies += copies_difference[card_idx]
+        num_this_card = 1 + copies
+        total_cards += num_this_card
+        copies_difference[card_idx+1] += num_this_card
+        copies_difference[min(card_idx+1+num_winning, num_cards)] -= num_this_card
+
+    return total_cards
+
+def stream_card_totals(card_strings: Iterable[str], max_num_winnings: int = None) -> Iterator[tuple[int, int]]:
+    """
+    Processes cards from any iterable (e.g. a file, stdin or a generator) and yields the point
+    sum and the total number of cards so far after each card. Copies won for upcoming cards
+    are kept in a ring buffer with one slot per card that can still receive copies, a slot is
+    retired and reused as soon as its card has passed, so memory stays constant
+
+    :param card_strings: iterable of card strings
+    :param max_num_winnings: the maximum count of winning numbers a card can have,
+                             defaults to the amount of winning numbers on the first card
+    """
+    pending_copies = None
+    point_sum = 0
+    total_cards = 0
+    for card_idx, card_string in enumerate(card_string for card_string in card_strings if card_string.strip()):
+        sratch_card = Scratchcard(card_string.split(":")[1])
+        num_winnings, points = sratch_card.calculate_num_winnings_and_points()
+        if pending_copies is None:
+            if max_num_winnings is None:
+                max_num_winnings = len(sratch_card.winning_numbers)
+            pending_copies = [0] * (max_num_winnings + 1)
+        if num_winnings > max_num_winnings:
+            raise ValueError(
+                f"Card {card_idx+1} has {num_winnings} winning numbers, but at most {max_num_winnings} are supported")
+
+        slot = card_idx % len(pending_copies)
+        num_this_card = 1 + pending_copies[slot]
+        pending_copies[slot] = 0
+        for i in range(1, num_winnings+1):
+            pending_copies[(slot+i) % len(pending_copies)] += num_this_card
+
+        point_sum += points
+        total_cards += num_this_card
+        yield point_sum, total_cards
+
 if __name__ == "__main__":
     
     with open("input.txt") as fp:
@@ -31,4 +123,17 @@ if __name__ == "__main__":
             card_idx += 1
         print(f"Part 1 Result: {point_sum}")
         print(f"Part 2 Resulst: {total_cards}")
+
+    with open("input.txt") as fp:
+        point_sum, total_cards = 0, 0
+        for point_sum, total_cards in stream_card_totals(fp):
+            pass
+        print(f"Part 1 Result (streamed): {point_sum}")
+        print(f"Part 2 Result (streamed): {total_cards}")
+
+    with open("input.txt") as fp:
+        winning_numbers, drawn_numbers = load_scratchcard_matrices(fp.readlines())
+        num_winnings = calculate_num_winnings_of_cards(winning_numbers, drawn_numbers)
+        print(f"Part 1 Result (batch): {calculate_points_of_cards(num_winnings).sum()}")
+        print(f"Part 2 Result (batch): {calculate_total_cards(num_winnings)}")
             
\ No newline at end of file
@@ -1,3 +1,11 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# all seeds, intermediate values and locations are expected to lie in [0, INDEX_LIMIT]
+INDEX_LIMIT = 2**62 - 1
+
+
 class SeedRange():
 
     def __init__(self, range_start: int, range_len: int) -> None:
@@ -18,6 +26,10 @@ class ConvertionDict():
         self.source = source
         self.destination = destination
         self.possible_convertions: list[ConvertionRange] = []
+        # sorted (src_start, src_end, offset) segments covering [0, INDEX_LIMIT], built once
+        # the rules are known
+        self.segments: tuple[tuple[int, int, int], ...] = ()
+        self.segment_starts: tuple[int, ...] = ()
 
     def initialize_convertion(self, convertion_strings: list[str]) -> None:
         """
@@ -29,33 +41,43 @@ class ConvertionDict():
             split_conv = convertion_string.split()
             self.possible_convertions.append(ConvertionRange(
                 int(split_conv[0]), int(split_conv[1]), int(split_conv[2])))
+        self.build_segments()
+
+    def build_segments(self) -> None:
+        """
+        Builds the immutable interval index of this dict: its rules as sorted
+        (src_start, src_end, offset) segments that cover the whole index space [0, INDEX_LIMIT],
+        parts without a rule are added as identity segments
+        """
+        segments = []
+        next_start = 0
+        for rule in sorted(self.possible_convertions, key=lambda x: x.src.start):
+            if rule.src.start > next_start:
+                segments.append((next_start, rule.src.start - 1, 0))
+            segments.append((rule.src.start, rule.src.end, rule.dest.start - rule.src.start))
+            next_start = rule.src.end + 1
+        if next_start <= INDEX_LIMIT:
+            segments.append((next_start, INDEX_LIMIT, 0))
 
+        self.segments = tuple(segments)
+        self.segment_starts = tuple(segment[0] for segment in segments)
 
-def fill_ruleset_gaps(convertion_dict: ConvertionDict, seed_range: SeedRange) -> list[ConvertionRange]:
-    """
-    Returns a new rule set based on the rule set of a given dict, that adds rules for the left out
-    parts of the rulest and rules after and before the maximum and minimum source index of the ruleset
-    if the SeedRange start index/end index is higher/smaller
 
-    :param convertion_dict: The conversion dict, which's ruleset we want to append
-    :param seed_range: SeedRange to add extra rules on the outer indices
-    """
-    convertion_rules: list[ConvertionRange] = sorted(
-        convertion_dict.possible_convertions, key=lambda x: x.src.start)
-    new_rules: list[ConvertionRange] = []
-    if seed_range.start < convertion_rules[0].src.start:
-        new_rules.append(ConvertionRange(seed_range.start, seed_range.start,
-                         convertion_rules[0].src.start - seed_range.start))
-    if seed_range.end > convertion_rules[-1].src.end:
-        new_rules.append(ConvertionRange(
-            convertion_rules[-1].src.end, convertion_rules[-1].src.end, seed_range.end - convertion_rules[-1].src.end))
-
-    for i, rule in enumerate(convertion_rules[:-1]):
-        if convertion_rules[i].src.end + 1 != convertion_rules[i+1].src.start:
-            new_rules.append(ConvertionRange(convertion_rules[i].src.end + 1,
-                                             convertion_rules[i].src.end + 1,
-                                             convertion_rules[i+1].src.start - convertion_rules[i].src.end + 1))
-    return convertion_rules + new_rules
+class SeedRangeSet():
+
+    def __init__(self, seed_ranges: list[SeedRange]) -> None:
+        """
+        Set of indices stored as SeedRanges that are sorted by their start and merged,
+        so that no two ranges overlap or touch each other
+
+        :param seed_ranges: the (possibly unsorted and overlapping) ranges of the set
+        """
+        self.ranges: list[SeedRange] = []
+        for seed_range in sorted(seed_ranges, key=lambda x: x.start):
+            if self.ranges and seed_range.start <= self.ranges[-1].end + 1:
+                self.ranges[-1].end = max(self.ranges[-1].end, seed_range.end)
+            else:
+                self.ranges.append(SeedRange(seed_range.start, seed_range.end - seed_range.start + 1))
 
 
 def calculate_locations(initial_seeds: list[int], convertion_dicts: list[ConvertionDict]) -> list[int]:
@@ -79,55 +101,128 @@ def calculate_locations(initial_seeds: list[int], convertion_dicts: list[Convert
     return locations
 
 
-def calculate_range_convertion(seed_range: SeedRange, convertion_rules: list[ConvertionRange]) -> list[SeedRange]:
+def calculate_range_convertion(seed_range: SeedRange, convertion_dict: ConvertionDict) -> list[SeedRange]:
     """
-    Converts a given SeedRange into new SeedRanges based on the rules given
+    Converts a given SeedRange into new SeedRanges based on the interval index of a dict.
+    The first overlapping segment is found by binary search, afterwards only the segments
+    the range actually touches are visited
 
     :param seed_range: the SeedRange to be converted
-    :param convertion_rules: the rules to be used for convertion
+    :param convertion_dict: the dict which's rules are used for convertion
     """
     new_ranges = []
-    for convertion_range in convertion_rules:
-
-        if seed_range.end < convertion_range.src.start or seed_range.start > convertion_range.src.end:
-            continue
-
-        new_start = max(seed_range.start, convertion_range.src.start)
-        new_end = min(seed_range.end, convertion_range.src.end)
-
-        dest_start = convertion_range.dest.start + \
-            (new_start - convertion_range.src.start)
-        dest_end = convertion_range.dest.start + \
-            (new_end - convertion_range.src.start)
-        new_ranges.append(SeedRange(dest_start, dest_end - dest_start))
+    idx = bisect_right(convertion_dict.segment_starts, seed_range.start) - 1
+    while idx < len(convertion_dict.segments) and convertion_dict.segment_starts[idx] <= seed_range.end:
+        src_start, src_end, offset = convertion_dict.segments[idx]
+        new_start = max(seed_range.start, src_start)
+        new_end = min(seed_range.end, src_end)
+        new_ranges.append(SeedRange(new_start + offset, new_end - new_start + 1))
+        idx += 1
 
     return new_ranges
 
 
-def calculate_locations_by_seed_ranges(seed_pairs: list[list[int]], convertion_dicts: list[ConvertionDict]) -> list[SeedRange]:
+def calculate_locations_by_seed_ranges(seed_pairs: list[list[int]], convertion_dicts: list[ConvertionDict],
+                                       fragment_counts: list[tuple[int, int]] = None) -> list[SeedRange]:
     """
-    Takes a list of seed_pairs representing ranges, converts them to SeedRanges and then 
-    converts these into location ranges (still type SeedRange) by iterating over  all ConvertionDicts and their rules.
-    Returns a list of location ranges
+    Takes a list of seed_pairs representing ranges, converts them to a SeedRangeSet and then 
+    converts this into location ranges (still type SeedRange) by iterating over  all ConvertionDicts and their rules.
+    The ranges are merged after every conversion, so the working set only grows with the number
+    of distinct boundaries. Returns a list of location ranges
 
     :param seed_pairs: seed range input, consisting of a list of seed start indices and the length of their range
     :param convertion_dicts: List of ConvertionDict objects (which contain the rules)
+    :param fragment_counts: if given, a tuple of the number of ranges before and after merging
+                            is appended for every conversion stage
     """
-    location_ranges = []
-    source_seed_ranges = [SeedRange(pair[0], pair[1]) for pair in seed_pairs]
-    for source in source_seed_ranges:
-        current_ranges = [source]
+    current_ranges = SeedRangeSet(
+        [SeedRange(pair[0], pair[1]) for pair in seed_pairs])
+    for convertion_dict in convertion_dicts:
+        fragments = []
+        for seed_range in current_ranges.ranges:
+            fragments += calculate_range_convertion(
+                seed_range, convertion_dict)
+
+        current_ranges = SeedRangeSet(fragments)
+        if fragment_counts is not None:
+            fragment_counts.append((len(fragments), len(current_ranges.ranges)))
+    return current_ranges.ranges
+
+
+class ComposedConvertion():
+
+    def __init__(self, segments: list[tuple[int, int, int]]) -> None:
+        """
+        Piecewise linear map given by sorted, disjoint (src_start, src_end, offset) segments
+        covering [0, INDEX_LIMIT]. Every source index inside a segment is mapped to index + offset
+
+        :param segments: the segments of the map
+        """
+        self.starts = [segment[0] for segment in segments]
+        self.ends = [segment[1] for segment in segments]
+        self.offsets = [segment[2] for segment in segments]
+        self.starts_array = np.array(self.starts, dtype=np.int64)
+        self.offsets_array = np.array(self.offsets, dtype=np.int64)
+
+    @classmethod
+    def compile(cls, convertion_dicts: list[ConvertionDict]) -> "ComposedConvertion":
+        """
+        Composes the whole chain of conversion dicts into a single ComposedConvertion. Each
+        segment of the chain so far is split at the segment boundaries of the next dict that its
+        image crosses, adjacent segments with equal offsets are merged afterwards
+
+        :param convertion_dicts: List of ConvertionDict objects (which contain the rules)
+        """
+        composed = [(0, INDEX_LIMIT, 0)]
         for convertion_dict in convertion_dicts:
-            new_ranges = []
-            for seed_range in current_ranges:
-                updated_convertion_rules = fill_ruleset_gaps(
-                    convertion_dict, seed_range)
-                new_ranges += calculate_range_convertion(
-                    seed_range, updated_convertion_rules)
+            next_map = cls(convertion_dict.segments)
+            new_composed = []
+            for src_start, src_end, offset in composed:
+                image_start, image_end = src_start + offset, src_end + offset
+                idx = bisect_right(next_map.starts, image_start) - 1
+                while image_start <= image_end:
+                    piece_end = min(image_end, next_map.ends[idx])
+                    piece = (image_start - offset, piece_end - offset,
+                             offset + next_map.offsets[idx])
+                    if new_composed and new_composed[-1][2] == piece[2] and new_composed[-1][1] + 1 == piece[0]:
+                        new_composed[-1] = (new_composed[-1][0], piece[1], piece[2])
+                    else:
+                        new_composed.append(piece)
+                    image_start = piece_end + 1
+                    idx += 1
+            composed = new_composed
+        return cls(composed)
 
-            current_ranges = new_ranges
-        location_ranges += current_ranges
-    return location_ranges
+    def convert(self, source: int) -> int:
+        """
+        Converts a single index by binary searching its segment
+
+        :param source: the index to convert
+        """
+        return source + self.offsets[bisect_right(self.starts, source) - 1]
+
+    def convert_many(self, sources: np.ndarray) -> np.ndarray:
+        """
+        Converts an array of indices at once with a single searchsorted
+
+        :param sources: the indices to convert
+        """
+        segment_indices = np.searchsorted(self.starts_array, sources, side="right") - 1
+        return sources + self.offsets_array[segment_indices]
+
+    def min_of_range(self, seed_range: SeedRange) -> int:
+        """
+        Returns the minimum converted index of a whole SeedRange. Inside a segment the map is
+        increasing, so only the first index of each segment overlapping the range has to be checked
+
+        :param seed_range: the range to convert
+        """
+        idx = bisect_right(self.starts, seed_range.start) - 1
+        min_index = seed_range.start + self.offsets[idx]
+        while idx + 1 < len(self.starts) and self.starts[idx + 1] <= seed_range.end:
+            idx += 1
+            min_index = min(min_index, self.starts[idx] + self.offsets[idx])
+        return min_index
 
 
 if __name__ == "__main__":
@@ -161,3 +256,10 @@ if __name__ == "__main__":
         seed_pairs, convertion_dicts)
     min_location_pairs = min(location_ranges, key=lambda x: x.start).start
     print(f"Part 2 Result: {min_location_pairs}")
+
+    composed_convertion = ComposedConvertion.compile(convertion_dicts)
+    composed_locations = composed_convertion.convert_many(np.array(initial_seeds, dtype=np.int64))
+    print(f"Part 1 Result (composed): {composed_locations.min()}")
+    min_location_composed = min(composed_convertion.min_of_range(SeedRange(start, length))
+                                for start, length in seed_pairs)
+    print(f"Part 2 Result (composed): {min_location_composed}")
@@ -1,5 +1,12 @@
+import math
+
 import numpy as np
 
+# below these bounds time**2 and 4*distance_record are exact in float64 and int64, so the
+# vectorized float path yields the exact integer square root of the discriminant
+FLOAT_SAFE_TIME = 2**26
+FLOAT_SAFE_DISTANCE_RECORD = 2**50
+
 class Race():
     def __init__(self, time: int, distance_record: int) -> None:
         self.time = time
@@ -9,16 +16,56 @@ class Race():
         """
         Calculates the ways to beat the race using the quadratic equation
         0 = holding_time^2 - holding_times*self.time + distance.
+        The integer square root is used, so the result is exact for races of any magnitude
         """
-        delta = np.sqrt((self.time**2 - 4*self.distance_record))
+        discriminant = self.time**2 - 4*self.distance_record
+        if discriminant <= 0:
+            return 0
+
+        # (time - isqrt(discriminant)) // 2 is either the smallest holding time that beats the
+        # record or the one right before it, since isqrt rounds down by less than 1
+        min_holding_time = (self.time - math.isqrt(discriminant)) // 2
+        if min_holding_time * (self.time - min_holding_time) <= self.distance_record:
+            min_holding_time += 1
+        min_holding_time = max(min_holding_time, 1)
+
+        # the distances are symmetric around time / 2
+        max_holding_time = min(self.time - min_holding_time, self.time - 1)
+        return max(0, max_holding_time - min_holding_time + 1)
+
+    @staticmethod
+    def calculate_number_ways_to_beat_batch(times: np.ndarray, distance_records: np.ndarray) -> np.ndarray:
+        """
+        Calculates the ways to beat many races at once. Races whose time and record are small
+        enough for float64 to be exact are solved with vectorized math and the same integer
+        correction as calculate_number_ways_to_beat, all others fall back to the exact
+        integer square root per race. If any race takes the fallback, the result has dtype object
+        so that ways of any magnitude are exact
+        """
+        times = np.asarray(times)
+        distance_records = np.asarray(distance_records)
+        is_integer_input = times.dtype.kind in "iu" and distance_records.dtype.kind in "iu"
+
+        if is_integer_input:
+            is_float_safe = (times >= 0) & (times < FLOAT_SAFE_TIME) & \
+                (distance_records >= 0) & (distance_records < FLOAT_SAFE_DISTANCE_RECORD)
+        else:
+            is_float_safe = np.zeros(len(times), dtype=bool)
+        ways = np.zeros(len(times), dtype=np.int64 if is_float_safe.all() else object)
+
+        safe_times = times[is_float_safe].astype(np.int64)
+        safe_records = distance_records[is_float_safe].astype(np.int64)
+        discriminants = safe_times**2 - 4*safe_records
+        sqrt_discriminants = np.floor(np.sqrt(np.maximum(discriminants, 0))).astype(np.int64)
+        min_holding_times = (safe_times - sqrt_discriminants) // 2
+        min_holding_times += min_holding_times * (safe_times - min_holding_times) <= safe_records
+        safe_ways = safe_times - 2*min_holding_times + 1
+        ways[is_float_safe] = np.where(discriminants > 0, np.maximum(safe_ways, 0), 0)
 
-        # When inserting self.distance_record to distance and rounding down the lower bound (x1)
-        # and rounding up the upper bound (x2), this means that x1 and x2 do not beat the record
-        # but all ints between x2 and x1 will beat the record. Thats why we calculate x2 - x1 - 1
-        x1 = int(np.floor((time - delta) / 2))
-        x2 = int(np.ceil((time + delta) / 2))
+        for idx in np.flatnonzero(~is_float_safe):
+            ways[idx] = Race(int(times[idx]), int(distance_records[idx])).calculate_number_ways_to_beat()
 
-        return x2 - x1 - 1
+        return ways
 
 if __name__ == "__main__":
     with open("input.txt") as fp:
@@ -32,6 +79,7 @@ if __name__ == "__main__":
             race = Race(time, distance)
             product_number_ways_to_beat *= race.calculate_number_ways_to_beat()
         print(f"Part 1 Result: {product_number_ways_to_beat}")
+        print(f"Part 1 Result (batch): {np.prod(Race.calculate_number_ways_to_beat_batch(times, distances))}")
         
         actual_race_time = int(''.join(map(str, times)))
         actual_distance = int(''.join(map(str, distances)))
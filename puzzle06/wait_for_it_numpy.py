@@ -1,18 +1,57 @@
+from itertools import islice
+from multiprocessing import Pool
+
 import numpy as np
 
+# the largest distance that can be computed in int64 without overflowing
+INT64_MAX = 2**63 - 1
+
 class Race(): 
     def __init__(self, time: int, distance_record: int) -> None:
         self.time = time
         self.distance_record = distance_record
 
-    def calculate_number_ways_to_beat(self) -> int:
+    def calculate_number_ways_to_beat(self, chunk_size: int = 1 << 20, num_processes: int = 1) -> int:
         """
         Tests all possible_holding times in a brute-force manner using numpy,
-        to get the number of possible ways to beat the self.distance_record
+        to get the number of possible ways to beat the self.distance_record.
+        The holding times are tested in chunks of chunk_size, so peak memory is bounded by the
+        chunk size, and the chunks can be spread over a pool of num_processes processes.
+        The chunks are generated lazily and handed to the pool in bounded windows, because the
+        pool would otherwise consume the whole chunk generator up front
+        """
+        chunks = ((start, min(start + chunk_size, self.time)) for start in range(1, self.time, chunk_size))
+        if num_processes == 1:
+            return sum(self.count_ways_to_beat_in_chunk(start, end) for start, end in chunks)
+
+        tasks_per_worker = 4
+        window_size = num_processes * tasks_per_worker * 4
+        ways_to_beat = 0
+        with Pool(num_processes) as pool:
+            while window := list(islice(chunks, window_size)):
+                ways_to_beat += sum(pool.imap_unordered(self.count_ways_to_beat_in_bounds, window,
+                                                        chunksize=tasks_per_worker))
+        return ways_to_beat
+
+    def count_ways_to_beat_in_bounds(self, bounds: tuple[int, int]) -> int:
+        """
+        Counts the holding times in [start, end) given as one tuple, so it can be used with Pool.imap_unordered
+        """
+        return self.count_ways_to_beat_in_chunk(*bounds)
+
+    def count_ways_to_beat_in_chunk(self, start: int, end: int) -> int:
+        """
+        Counts the holding times in [start, end) that beat the self.distance_record.
+        The distances are computed in int64 only if the largest possible distance (at time / 2)
+        and the record fit into it, otherwise exact python integers are used
         """
-        holding_times = np.arange(1, self.time)
+        max_distance = (self.time // 2) * (self.time - self.time // 2)
+        if max_distance <= INT64_MAX and abs(self.distance_record) <= INT64_MAX:
+            holding_times = np.arange(start, end, dtype=np.int64)
+        else:
+            holding_times = np.array(range(start, end), dtype=object)
         distances = holding_times * (self.time - holding_times)
-        return np.sum(distances > self.distance_record)
+        return int(np.count_nonzero(distances > self.distance_record))
 
 if __name__ == "__main__":
     with open("input.txt") as fp:
@@ -31,6 +70,7 @@ if __name__ == "__main__":
         actual_distance = int(''.join(map(str, distances)))
         actual_race = Race(actual_race_time, actual_distance)
         print(f"Part 2 Result: {actual_race.calculate_number_ways_to_beat()}")
+        print(f"Part 2 Result (4 processes): {actual_race.calculate_number_ways_to_beat(num_processes=4)}")
 
 
         
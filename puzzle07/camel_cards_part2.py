@@ -1,16 +1,15 @@
-from enum import Enum
+from functools import partial
 import numpy as np
 
+from external_sort import calculate_winnings_sum_external
+
+from hand_strength_table import JOKER_RULES, HandType, calculate_hand_index, calculate_hand_indices, calculate_primary_scores, load_hand_strength_table
+
 
 class CamelHand():
-    class SCORES(Enum):
-        FIVE_OF_A_KIND = 7
-        FOUR_OF_A_KIND = 6
-        FULL_HOUSE = 5
-        THREE_OF_A_KIND = 4
-        TWO_PAIR = 3
-        ONE_PAIR = 2
-        HIGH_CARD = 1
+    SCORES = HandType
+    # memory mapped on the first hand that is created
+    hand_strength_table: np.ndarray = None
 
     card_to_value = {
         "J": 1,
@@ -40,62 +39,15 @@ class CamelHand():
         else:
             return self.secondary_score < other.secondary_score
 
-    def replace_J_optimal(self, card_values: list[int], counts: list[int]) -> tuple[list[int], list[int]]:
-        """
-        Returns a list of card values and counts after replacing J with the maximum
-        occuring card_value of all other values
-
-        :param card_values: The card values before replacement
-        :param counts: The counts before replacement
-        """
-        J_idx = card_values.index("J")
-        J_count = counts[J_idx]
-
-        del card_values[J_idx]
-        del counts[J_idx]
-
-        best_convertion_idx = max(
-            enumerate(counts), key=lambda x: x[1])[0]
-
-        counts[best_convertion_idx] += J_count
-        return card_values, counts
-
     def initialize_primary_score(self) -> None:
         """
-        Calculates the primary score of this hand by using the function replace_J_optimal to replace
-        the Joker J and counting occurances of unique card types
+        Looks up the primary score of this hand in the precomputed hand strength
+        table, which already accounts for replacing the Joker J optimally
         """
-        before_card_values, before_counts = np.unique(
-            self.hand, return_counts=True)
-
-        if "J" in self.hand and len(before_counts) != 1:
-            _, counts = self.replace_J_optimal(
-                list(before_card_values), list(before_counts))
-        else:
-            _, counts = before_card_values, before_counts
-
-        n_unique_cards = len(counts)
-
-        if n_unique_cards == 1:
-            self.primary_score = self.SCORES.FIVE_OF_A_KIND
-
-        elif n_unique_cards == 2:
-            if 1 in counts:
-                self.primary_score = self.SCORES.FOUR_OF_A_KIND
-            else:
-                self.primary_score = self.SCORES.FULL_HOUSE
-
-        elif n_unique_cards == 3:
-            if 3 in counts:
-                self.primary_score = self.SCORES.THREE_OF_A_KIND
-            else:
-                self.primary_score = self.SCORES.TWO_PAIR
-
-        elif n_unique_cards == 4:
-            self.primary_score = self.SCORES.ONE_PAIR
-
-        else:
-            self.primary_score = self.SCORES.HIGH_CARD
+        if CamelHand.hand_strength_table is None:
+            CamelHand.hand_strength_table = load_hand_strength_table()
+        hand_index = calculate_hand_index(self.hand)
+        self.primary_score = self.SCORES(int(self.hand_strength_table[JOKER_RULES][hand_index]))
 
     def initialize_secondary_score(self) -> None:
         """
@@ -129,6 +81,81 @@ def calculate_winnings_sum(hands: list[CamelHand]) -> int:
     return bid_sum
 
 
+def load_card_matrix(hand_strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parses all hands at once into a (num_hands, 5) matrix of card values and an array of bids
+
+    :param hand_strings: contains the lines of the input, each consisting of a hand and its bid
+    """
+    hands, bids = zip(*(line.split() for line in hand_strings if line.strip()))
+    value_lookup = np.zeros(256, dtype=np.int64)
+    for card, value in CamelHand.card_to_value.items():
+        value_lookup[ord(card)] = value
+
+    card_bytes = np.frombuffer("".join(hands).encode(), dtype=np.uint8)
+    return value_lookup[card_bytes].reshape(len(hands), 5), np.array(bids, dtype=np.int64)
+
+
+def calculate_hand_keys(cards: np.ndarray) -> np.ndarray:
+    """
+    Encodes every hand as a single integer that orders like CamelHand: the primary score (with J as joker) is
+    stored above bit 20 and the card values as base 16 digits below it
+
+    :param cards: (num_hands, 5) matrix of card values
+    """
+    primary_scores = calculate_primary_scores(cards, joker=CamelHand.card_to_value["J"])
+    secondary_scores = (cards << (4 * np.arange(4, -1, -1))).sum(axis=1)
+
+    return (primary_scores << 20) | secondary_scores
+
+
+def calculate_hand_keys_with_table(cards: np.ndarray, hand_strength_table: np.ndarray) -> np.ndarray:
+    """
+    Encodes every hand as a single integer like calculate_hand_keys, but looks the
+    primary score up in the precomputed hand strength table by the base 13 index of the hand
+
+    :param cards: (num_hands, 5) matrix of card values
+    :param hand_strength_table: the table created by hand_strength_table.build_hand_strength_table
+    """
+    hand_indices = calculate_hand_indices(cards, CamelHand.card_to_value)
+    primary_scores = hand_strength_table[JOKER_RULES][hand_indices].astype(np.int64)
+    secondary_scores = (cards << (4 * np.arange(4, -1, -1))).sum(axis=1)
+
+    return (primary_scores << 20) | secondary_scores
+
+
+def calculate_winnings_sum_batch(cards: np.ndarray, bids: np.ndarray, hand_strength_table: np.ndarray = None) -> int:
+    """
+    Ranks all hands with a single argsort over their integer keys and returns the sum
+    of all winnings
+
+    :param cards: (num_hands, 5) matrix of card values
+    :param bids: the bid of each hand
+    :param hand_strength_table: if given, the primary scores are looked up in this table
+                                instead of being computed
+    """
+    if hand_strength_table is None:
+        hand_keys = calculate_hand_keys(cards)
+    else:
+        hand_keys = calculate_hand_keys_with_table(cards, hand_strength_table)
+    ranking = np.argsort(hand_keys, kind="stable")
+    return int((np.arange(1, len(bids) + 1) * bids[ranking]).sum())
+
+
+def calculate_keys_and_bids(hand_strings: list[str], hand_strength_table: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converts input lines into an array of hand keys and an array of bids
+
+    :param hand_strings: contains the lines of the input, each consisting of a hand and its bid
+    :param hand_strength_table: if given, the primary scores are looked up in this table
+                                instead of being computed
+    """
+    cards, bids = load_card_matrix(hand_strings)
+    if hand_strength_table is None:
+        return calculate_hand_keys(cards), bids
+    return calculate_hand_keys_with_table(cards, hand_strength_table), bids
+
+
 if __name__ == "__main__":
     all_hands: list[CamelHand] = []
 
@@ -139,3 +166,14 @@ if __name__ == "__main__":
             all_hands.append(CamelHand(hand, bid))
 
     print(f"Part 2 Result: {calculate_winnings_sum(all_hands)}")
+
+    with open("input.txt") as fp:
+        cards, bids = load_card_matrix(fp.readlines())
+    print(f"Part 2 Result (batch): {calculate_winnings_sum_batch(cards, bids)}")
+    hand_strength_table = load_hand_strength_table()
+    print(f"Part 2 Result (table): {calculate_winnings_sum_batch(cards, bids, hand_strength_table)}")
+
+    with open("input.txt") as fp:
+        external_winnings_sum = calculate_winnings_sum_external(
+            fp, partial(calculate_keys_and_bids, hand_strength_table=hand_strength_table), run_size=128)
+    print(f"Part 2 Result (external sort): {external_winnings_sum}")
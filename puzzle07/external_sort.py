@@ -0,0 +1,124 @@
+import heapq
+import os
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+
+import numpy as np
+
+
+# compact on-disk record of one hand: its integer key and its bid
+RECORD_DTYPE = np.dtype([("key", "<i8"), ("bid", "<i8")])
+
+
+def write_sorted_runs(hand_strings: Iterable[str], to_keys_and_bids: Callable[[list[str]], tuple[np.ndarray, np.ndarray]],
+                      directory: str, run_size: int) -> list[str]:
+    """
+    Reads run_size hands at a time, sorts them by their key and writes them as compact
+    (key, bid) records to a file in directory. Returns the paths of all run files
+
+    :param hand_strings: iterable of input lines, each consisting of a hand and its bid
+    :param to_keys_and_bids: converts a list of input lines into arrays of hand keys and bids
+    :param directory: the directory to write the runs to
+    :param run_size: the maximum number of hands held in memory at once
+    """
+    run_paths = []
+    hand_strings = (line for line in hand_strings if line.strip())
+    while batch := list(islice(hand_strings, run_size)):
+        keys, bids = to_keys_and_bids(batch)
+        ranking = np.argsort(keys, kind="stable")
+        records = np.empty(len(batch), dtype=RECORD_DTYPE)
+        records["key"] = keys[ranking]
+        records["bid"] = bids[ranking]
+
+        run_path = os.path.join(directory, f"run_{len(run_paths)}.bin")
+        records.tofile(run_path)
+        run_paths.append(run_path)
+
+    return run_paths
+
+
+def read_run(run_path: str, block_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Yields the (key, bid) records of a run file in order, reading block_size records at a time
+    through a single buffered file handle
+
+    :param run_path: path of the run file
+    :param block_size: the number of records read at once
+    """
+    with open(run_path, "rb") as fp:
+        while len(records := np.fromfile(fp, dtype=RECORD_DTYPE, count=block_size)):
+            yield from records.tolist()
+
+
+def merge_runs(run_paths: list[str], block_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Yields the records of all given runs k-way merged by their key. heapq.merge is stable,
+    so equal keys keep the order of the runs (which is the order of the input) like list.sort
+
+    :param run_paths: paths of the sorted run files, in input order
+    :param block_size: the number of records read at once from each run
+    """
+    runs = [read_run(run_path, block_size) for run_path in run_paths]
+    return heapq.merge(*runs, key=lambda record: record[0])
+
+
+def reduce_runs(run_paths: list[str], directory: str, max_fan_in: int, block_size: int) -> list[str]:
+    """
+    Merges groups of at most max_fan_in consecutive runs into intermediate runs until no more
+    than max_fan_in runs are left, so that the number of files open at once stays bounded.
+    Returns the paths of the remaining runs
+
+    :param run_paths: paths of the sorted run files, in input order
+    :param directory: the directory to write the intermediate runs to
+    :param max_fan_in: the maximum number of runs merged at once
+    :param block_size: the number of records read and written at once
+    """
+    merge_pass = 0
+    while len(run_paths) > max_fan_in:
+        merged_paths = []
+        for group_start in range(0, len(run_paths), max_fan_in):
+            group = run_paths[group_start:group_start + max_fan_in]
+            merged_path = os.path.join(directory, f"pass_{merge_pass}_run_{len(merged_paths)}.bin")
+            buffer = np.empty(block_size, dtype=RECORD_DTYPE)
+            num_buffered = 0
+            with open(merged_path, "wb") as fp:
+                for record in merge_runs(group, block_size):
+                    buffer[num_buffered] = record
+                    num_buffered += 1
+                    if num_buffered == block_size:
+                        buffer.tofile(fp)
+                        num_buffered = 0
+                buffer[:num_buffered].tofile(fp)
+            for run_path in group:
+                os.remove(run_path)
+            merged_paths.append(merged_path)
+        run_paths = merged_paths
+        merge_pass += 1
+
+    return run_paths
+
+
+def calculate_winnings_sum_external(hand_strings: Iterable[str], to_keys_and_bids: Callable[[list[str]], tuple[np.ndarray, np.ndarray]],
+                                    run_size: int = 1 << 20, block_size: int = 1 << 12, max_fan_in: int = 64) -> int:
+    """
+    Calculates the sum of all winnings with an external merge sort: the hands are streamed into
+    sorted runs on disk which are then k-way merged while rank * bid is accumulated. If there are
+    more than max_fan_in runs, they are first merged in multiple passes. Memory is bounded by
+    run_size while writing and by block_size per open run while merging
+
+    :param hand_strings: iterable of input lines, each consisting of a hand and its bid
+    :param to_keys_and_bids: converts a list of input lines into arrays of hand keys and bids
+    :param run_size: the maximum number of hands sorted in memory at once
+    :param block_size: the number of records read at once from each run while merging
+    :param max_fan_in: the maximum number of runs (and therefore files) open at once while merging
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        run_paths = write_sorted_runs(hand_strings, to_keys_and_bids, directory, run_size)
+        run_paths = reduce_runs(run_paths, directory, max_fan_in, block_size)
+
+        bid_sum = 0
+        for rank, (_, bid) in enumerate(merge_runs(run_paths, block_size), start=1):
+            bid_sum += rank * bid
+
+    return bid_sum
@@ -0,0 +1,144 @@
+import os
+import tempfile
+from enum import Enum
+import numpy as np
+
+
+# cards in the order of their base 13 digit, the digit of a card is the same for both rules
+CARDS = "23456789TJQKA"
+CARD_TO_DIGIT = {card: digit for digit, card in enumerate(CARDS)}
+NUM_HANDS = len(CARDS)**5
+
+# rows of the hand strength table
+NORMAL_RULES = 0
+JOKER_RULES = 1
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_strength_table.npy")
+
+class HandType(Enum):
+    FIVE_OF_A_KIND = 7
+    FOUR_OF_A_KIND = 6
+    FULL_HOUSE = 5
+    THREE_OF_A_KIND = 4
+    TWO_PAIR = 3
+    ONE_PAIR = 2
+    HIGH_CARD = 1
+
+
+# primary score indexed by the sum of the squared counts of all distinct cards of a hand,
+# e.g. a full house has counts 3 and 2 and therefore the index 3^2 + 2^2 = 13
+SQUARED_COUNTS_OF_HAND_TYPE = {
+    HandType.FIVE_OF_A_KIND: 25,
+    HandType.FOUR_OF_A_KIND: 17,
+    HandType.FULL_HOUSE: 13,
+    HandType.THREE_OF_A_KIND: 11,
+    HandType.TWO_PAIR: 9,
+    HandType.ONE_PAIR: 7,
+    HandType.HIGH_CARD: 5,
+}
+PRIMARY_SCORE_BY_SQUARED_COUNTS = np.zeros(26, dtype=np.int8)
+PRIMARY_SCORE_BY_SQUARED_COUNTS[list(SQUARED_COUNTS_OF_HAND_TYPE.values())] = [
+    hand_type.value for hand_type in SQUARED_COUNTS_OF_HAND_TYPE]
+
+
+def calculate_primary_scores(cards: np.ndarray, joker: int = None) -> np.ndarray:
+    """
+    Returns the primary score (the HandType value) of every hand in a (num_hands, 5) matrix of
+    cards. Summing how often each card occurs in its hand over all positions gives the sum of
+    the squared counts, which determines the hand type. If joker is given, all jokers are added
+    to the most frequent other card, which raises its count m by j and the sum by 2mj + j^2
+
+    :param cards: (num_hands, 5) matrix of cards, any integer encoding of the cards works
+    :param joker: the encoding of the joker card, None for the normal rules
+    """
+    card_frequencies = np.zeros(cards.shape, dtype=np.int64)
+    for position in range(cards.shape[1]):
+        card_frequencies += cards == cards[:, position:position+1]
+    if joker is None:
+        return PRIMARY_SCORE_BY_SQUARED_COUNTS[card_frequencies.sum(axis=1)].astype(np.int64)
+
+    is_joker = cards == joker
+    card_frequencies[is_joker] = 0
+    num_jokers = is_joker.sum(axis=1)
+    most_frequent = card_frequencies.max(axis=1)
+    squared_counts = card_frequencies.sum(axis=1) + 2 * most_frequent * num_jokers + num_jokers**2
+    return PRIMARY_SCORE_BY_SQUARED_COUNTS[squared_counts].astype(np.int64)
+
+
+def calculate_hand_indices(cards: np.ndarray, card_to_value: dict[str, int]) -> np.ndarray:
+    """
+    Returns the base 13 index of every hand in a (num_hands, 5) matrix of card values
+
+    :param cards: (num_hands, 5) matrix of card values
+    :param card_to_value: the mapping from card to card value that was used to create the matrix
+    """
+    value_to_digit = np.zeros(max(card_to_value.values()) + 1, dtype=np.int64)
+    for card, value in card_to_value.items():
+        value_to_digit[value] = CARD_TO_DIGIT[card]
+
+    return value_to_digit[cards] @ (len(CARDS) ** np.arange(4, -1, -1))
+
+
+def calculate_hand_index(hand: str) -> int:
+    """
+    Returns the base 13 index of a single hand, which is its position in the hand strength table
+
+    :param hand: the five cards of the hand, e.g. "32T3K"
+    """
+    hand_index = 0
+    for card in hand:
+        hand_index = hand_index * len(CARDS) + CARD_TO_DIGIT[card]
+
+    return hand_index
+
+
+def build_hand_strength_table() -> np.ndarray:
+    """
+    Classifies every possible hand once under the normal and the joker rules.
+    Returns a (2, 13^5) int8 table of primary scores indexed by the rules and the base 13 index
+    of the hand
+    """
+    digits = np.arange(NUM_HANDS)[:, np.newaxis] // (len(CARDS) ** np.arange(4, -1, -1)) % len(CARDS)
+
+    hand_strength_table = np.empty((2, NUM_HANDS), dtype=np.int8)
+    hand_strength_table[NORMAL_RULES] = calculate_primary_scores(digits)
+    hand_strength_table[JOKER_RULES] = calculate_primary_scores(digits, joker=CARD_TO_DIGIT["J"])
+
+    return hand_strength_table
+
+
+def save_hand_strength_table(path: str) -> None:
+    """
+    Builds the hand strength table and saves it to path. The table is written to a temporary file
+    in the same directory first and then moved into place, so a crash or a concurrent run never
+    leaves a partially written table at path
+
+    :param path: path of the .npy file to write
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            np.save(fp, build_hand_strength_table())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_hand_strength_table(path: str = DEFAULT_TABLE_PATH) -> np.ndarray:
+    """
+    Memory maps the hand strength table stored at path. If there is no valid table yet, it is
+    built and saved there first, so it only has to be computed once
+
+    :param path: path of the .npy file containing the table
+    """
+    if os.path.exists(path):
+        try:
+            hand_strength_table = np.load(path, mmap_mode="r")
+            if hand_strength_table.shape == (2, NUM_HANDS) and hand_strength_table.dtype == np.int8:
+                return hand_strength_table
+        except (ValueError, OSError, EOFError):
+            pass
+
+    save_hand_strength_table(path)
+    return np.load(path, mmap_mode="r")
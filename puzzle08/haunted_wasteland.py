@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 class NodeNeighbors():
     def __init__(self, left: str, right: str) -> None:
@@ -33,6 +35,259 @@ def count_steps_to_goal(start: str, goal: str, instruction_string: str, node_dic
             steps += 1
 
 
+class CompiledNetwork():
+    def __init__(self, instruction_string: str, node_dict: dict[str, NodeNeighbors]) -> None:
+        """
+        Compiles the network into integer indexed successor arrays and precomputes where every
+        node ends up after one full pass of the instruction string (a period). Powers of this
+        period table are built lazily for binary lifting, so that walks can skip 2^k periods at once
+
+        :param instruction_string: Only contains "L" for left and "R" for right
+        :param node_dict: contains all nodes and their as keys and their neighbors als values
+        """
+        self.names = list(node_dict.keys())
+        self.node_ids = {name: node_id for node_id, name in enumerate(self.names)}
+        self.left = np.array([self.node_ids[node_dict[name].left]
+                             for name in self.names], dtype=np.int64)
+        self.right = np.array([self.node_ids[node_dict[name].right]
+                              for name in self.names], dtype=np.int64)
+        self.instruction_is_right = [instruction == "R" for instruction in instruction_string]
+        self.period = len(instruction_string)
+
+        self.period_jumps = [self.walk_instructions(np.arange(len(self.names)), self.period)]
+        self.goal_tables: dict[str, tuple[np.ndarray, list[np.ndarray]]] = {}
+
+    def walk_instructions(self, node_ids: np.ndarray, num_instructions: int) -> np.ndarray:
+        """
+        Moves all given nodes along the first num_instructions instructions at once
+
+        :param node_ids: the current node ids
+        :param num_instructions: how many instructions to follow (at most one period)
+        """
+        for is_right in self.instruction_is_right[:num_instructions]:
+            node_ids = self.right[node_ids] if is_right else self.left[node_ids]
+        return node_ids
+
+    def get_period_jump(self, level: int) -> np.ndarray:
+        """
+        Returns the table of where every node ends up after 2^level periods
+
+        :param level: the power of two of periods to jump
+        """
+        while len(self.period_jumps) <= level:
+            self.period_jumps.append(self.period_jumps[-1][self.period_jumps[-1]])
+        return self.period_jumps[level]
+
+    def goal_mask(self, goal: str) -> np.ndarray:
+        """
+        Returns a boolean array that is True for every goal node
+
+        :param goal: Either has len 1, meaning that we want to search for any goal node
+                    ending with the goal str, or represents a whole node
+        """
+        if len(goal) == 1:
+            return np.array([name[-1] == goal for name in self.names])
+        return np.array([name == goal for name in self.names])
+
+    def get_goal_tables(self, goal: str) -> tuple[np.ndarray, list[np.ndarray]]:
+        """
+        Returns for every node the first instruction index within one period at which a goal is
+        visited (-1 if none) and for every level k whether a goal is visited within the next
+        2^k periods. Levels are built until 2^k exceeds the number of nodes, after that many
+        periods the walk has entered a cycle, so no goal will be visited anymore
+
+        :param goal: the goal as in goal_mask
+        """
+        if goal not in self.goal_tables:
+            is_goal = self.goal_mask(goal)
+            first_goal_in_period = np.full(len(self.names), -1, dtype=np.int64)
+            node_ids = np.arange(len(self.names))
+            for instruction_idx, is_right in enumerate(self.instruction_is_right):
+                first_goal_in_period[is_goal[node_ids] & (first_goal_in_period < 0)] = instruction_idx
+                node_ids = self.right[node_ids] if is_right else self.left[node_ids]
+
+            goal_within_periods = [first_goal_in_period >= 0]
+            while 2**(len(goal_within_periods) - 1) <= len(self.names):
+                level = len(goal_within_periods) - 1
+                goal_within_periods.append(
+                    goal_within_periods[level] | goal_within_periods[level][self.get_period_jump(level)])
+            self.goal_tables[goal] = (first_goal_in_period, goal_within_periods)
+
+        return self.goal_tables[goal]
+
+    def position_after(self, start: str, steps: int) -> str:
+        """
+        Returns the node reached after following the instructions for the given amount of steps,
+        using O(log(steps)) period jumps plus at most one partial period
+
+        :param start: The start node
+        :param steps: the number of steps to walk
+        """
+        num_periods, remaining_steps = divmod(steps, self.period)
+        node_id = self.node_ids[start]
+        for level in range(num_periods.bit_length()):
+            if num_periods >> level & 1:
+                node_id = self.get_period_jump(level)[node_id]
+        return self.names[self.walk_instructions(node_id, remaining_steps)]
+
+    def count_steps_to_goal(self, start: str, goal: str) -> int:
+        """
+        Returns the steps needed to get from start to the first goal like count_steps_to_goal,
+        but skips all periods without a goal by descending the binary lifting levels.
+        Returns -1 if no goal is ever reached
+
+        :param start: The start node
+        :param goal: the goal as in goal_mask
+        """
+        first_goal_in_period, goal_within_periods = self.get_goal_tables(goal)
+        node_id = self.node_ids[start]
+        num_periods = 0
+        for level in reversed(range(len(goal_within_periods))):
+            if not goal_within_periods[level][node_id]:
+                node_id = self.get_period_jump(level)[node_id]
+                num_periods += 2**level
+
+        if first_goal_in_period[node_id] < 0:
+            return -1
+        return num_periods * self.period + int(first_goal_in_period[node_id])
+
+    def simulate_lockstep(self, starts: list[str], goal: str, max_steps: int) -> int:
+        """
+        Walks all ghosts at once, keeping their current node ids in one array that is advanced
+        by fancy indexing into the successor arrays. Returns the first step at which all ghosts
+        are on a goal node or -1 if this does not happen within max_steps steps
+
+        :param starts: The start nodes of all ghosts
+        :param goal: the goal as in goal_mask
+        :param max_steps: the maximum number of steps to simulate
+        """
+        is_goal = self.goal_mask(goal)
+        node_ids = np.array([self.node_ids[start] for start in starts], dtype=np.int64)
+        for step in range(max_steps + 1):
+            if is_goal[node_ids].all():
+                return step
+            if self.instruction_is_right[step % self.period]:
+                node_ids = self.right[node_ids]
+            else:
+                node_ids = self.left[node_ids]
+        return -1
+
+
+class GhostCycle():
+    def __init__(self, cycle_start: int, cycle_length: int, transient_goal_steps: list[int], cycle_goal_steps: list[int]) -> None:
+        """
+        Describes the walk of one ghost: after cycle_start steps the ghost runs through a cycle
+        of cycle_length steps forever. The goal is visited at the transient_goal_steps before the
+        cycle and at cycle_goal_steps + k * cycle_length for every k >= 0
+
+        :param cycle_start: the step at which the ghost first enters its cycle
+        :param cycle_length: the length of the cycle in steps
+        :param transient_goal_steps: the steps < cycle_start at which a goal is visited
+        :param cycle_goal_steps: the steps in [cycle_start, cycle_start + cycle_length) at which a goal is visited
+        """
+        self.cycle_start = cycle_start
+        self.cycle_length = cycle_length
+        self.transient_goal_steps = transient_goal_steps
+        self.cycle_goal_steps = cycle_goal_steps
+        self.cycle_goal_step_set = set(cycle_goal_steps)
+
+    def visits_goal_at(self, step: int) -> bool:
+        """
+        Returns whether the ghost is on a goal node after the given amount of steps
+
+        :param step: the number of steps walked
+        """
+        if step < self.cycle_start:
+            return step in self.transient_goal_steps
+        return self.cycle_start + (step - self.cycle_start) % self.cycle_length in self.cycle_goal_step_set
+
+
+def analyse_ghost_cycle(compiled_network: CompiledNetwork, start: str, goal: str) -> GhostCycle:
+    """
+    Finds the cycle of the walk starting at start. A state is a pair of node and instruction
+    index, states with instruction index 0 are exactly the nodes after whole periods, so the
+    cycle is found on the period table and then converted to steps
+
+    :param compiled_network: the compiled network to walk
+    :param start: The start node
+    :param goal: the goal as in CompiledNetwork.goal_mask
+    """
+    period_jump = compiled_network.get_period_jump(0)
+    first_seen_at_period = {}
+    node_id = compiled_network.node_ids[start]
+    while node_id not in first_seen_at_period:
+        first_seen_at_period[node_id] = len(first_seen_at_period)
+        node_id = int(period_jump[node_id])
+    cycle_start = first_seen_at_period[node_id] * compiled_network.period
+    cycle_length = (len(first_seen_at_period) - first_seen_at_period[node_id]) * compiled_network.period
+
+    is_goal = compiled_network.goal_mask(goal)
+    goal_steps = []
+    node_id = compiled_network.node_ids[start]
+    for step in range(cycle_start + cycle_length):
+        if is_goal[node_id]:
+            goal_steps.append(step)
+        if compiled_network.instruction_is_right[step % compiled_network.period]:
+            node_id = compiled_network.right[node_id]
+        else:
+            node_id = compiled_network.left[node_id]
+
+    return GhostCycle(cycle_start, cycle_length,
+                      [step for step in goal_steps if step < cycle_start],
+                      [step for step in goal_steps if step >= cycle_start])
+
+
+def combine_congruences(remainder1: int, modulus1: int, remainder2: int, modulus2: int) -> tuple[int, int] | None:
+    """
+    Combines x = remainder1 mod modulus1 and x = remainder2 mod modulus2 into a single
+    congruence x = remainder mod lcm(modulus1, modulus2) with the generalised Chinese Remainder
+    Theorem (the moduli do not need to be coprime). Returns None if there is no solution
+
+    :param remainder1: remainder of the first congruence
+    :param modulus1: modulus of the first congruence
+    :param remainder2: remainder of the second congruence
+    :param modulus2: modulus of the second congruence
+    """
+    gcd = math.gcd(modulus1, modulus2)
+    if (remainder2 - remainder1) % gcd != 0:
+        return None
+    lcm = modulus1 // gcd * modulus2
+    factor = (remainder2 - remainder1) // gcd * pow(modulus1 // gcd, -1, modulus2 // gcd)
+    return (remainder1 + modulus1 * (factor % (modulus2 // gcd))) % lcm, lcm
+
+
+def first_simultaneous_arrival(ghost_cycles: list[GhostCycle]) -> int:
+    """
+    Returns the first step at which all ghosts are on a goal node at the same time, or -1 if
+    that never happens. Steps before the last ghost enters its cycle are checked directly,
+    all later steps are solved by combining the cycle goal steps of all ghosts with the CRT
+
+    :param ghost_cycles: the analysed cycles of all ghosts
+    """
+    if not ghost_cycles:
+        return -1
+    latest_cycle_ghost = max(ghost_cycles, key=lambda x: x.cycle_start)
+    for step in latest_cycle_ghost.transient_goal_steps:
+        if all(ghost_cycle.visits_goal_at(step) for ghost_cycle in ghost_cycles):
+            return step
+
+    # after the latest cycle start every ghost visits a goal exactly at its cycle goal steps modulo its cycle length
+    congruences = [(0, 1)]
+    for ghost_cycle in ghost_cycles:
+        combined_congruences = set()
+        for remainder, modulus in congruences:
+            for goal_step in ghost_cycle.cycle_goal_steps:
+                combined = combine_congruences(remainder, modulus, goal_step % ghost_cycle.cycle_length, ghost_cycle.cycle_length)
+                if combined:
+                    combined_congruences.add(combined)
+        congruences = list(combined_congruences)
+
+    min_step = latest_cycle_ghost.cycle_start
+    first_steps = [remainder + -(-max(min_step - remainder, 0) // modulus) * modulus
+                   for remainder, modulus in congruences]
+    return min(first_steps, default=-1)
+
+
 if __name__ == "__main__":
     node_dict = {}
     nodes_ending_on_A = []
@@ -54,3 +309,11 @@ if __name__ == "__main__":
         steps_for_all_a = [count_steps_to_goal(
             start=node, goal="Z", instruction_string=instructions, node_dict=node_dict) for node in nodes_ending_on_A]
         print(f"Part 2 Result {math.lcm(*steps_for_all_a)}")
+
+        compiled_network = CompiledNetwork(instructions, node_dict)
+        print(f"Part 1 Result (compiled) {compiled_network.count_steps_to_goal('AAA', 'ZZZ')}")
+        compiled_steps_for_all_a = [compiled_network.count_steps_to_goal(node, "Z") for node in nodes_ending_on_A]
+        print(f"Part 2 Result (compiled) {math.lcm(*compiled_steps_for_all_a)}")
+        ghost_cycles = [analyse_ghost_cycle(compiled_network, node, "Z") for node in nodes_ending_on_A]
+        print(f"Part 2 Result (CRT) {first_simultaneous_arrival(ghost_cycles)}")
+        print(f"Part 1 Result (lockstep) {compiled_network.simulate_lockstep(['AAA'], 'ZZZ', max_steps=10**6)}")
@@ -1,3 +1,9 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
 class HistoryAnalyser():
     def __init__(self, start_sequence: list[int]) -> None:
         self.sequences = [start_sequence]
@@ -34,6 +40,108 @@ class HistoryAnalyser():
             current_sub = seq[0] - current_sub
         return current_sub
 
+class IncrementalHistoryAnalyser():
+    def __init__(self) -> None:
+        # last value of every difference level that is not all zero, starting with the history itself
+        self.last_values: list[int] = []
+        self.num_values = 0
+
+    def append(self, value: int) -> None:
+        """
+        Appends a value to the history by updating the last value of each difference level
+        from the history downwards in O(depth). Levels below the deepest stored one only contain
+        zeros, so if a non zero difference reaches them, it is the last value of every remaining
+        level down to the level of length 1
+        """
+        self.num_values += 1
+        difference = value
+        for level, last_value in enumerate(self.last_values):
+            self.last_values[level] = difference
+            difference = difference - last_value
+
+        if not self.last_values or difference != 0:
+            self.last_values += [difference] * (self.num_values - len(self.last_values))
+
+    def predict_next_value(self) -> int:
+        """
+        Extrapolates and returns the next value of the history
+        by adding the last values of each difference level
+        """
+        return sum(self.last_values)
+
+def load_histories_by_length(history_strings: list[str]) -> dict[int, np.ndarray]:
+    """
+    Parses all histories and groups them by their length into 2D integer arrays,
+    one row per history
+    """
+    histories_by_length: dict[int, list[list[int]]] = {}
+    for line in history_strings:
+        sequence = [int(x) for x in line.split()]
+        if sequence:
+            histories_by_length.setdefault(len(sequence), []).append(sequence)
+
+    return {length: np.array(histories, dtype=np.int64) for length, histories in histories_by_length.items()}
+
+def predict_next_and_previous_values(histories: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Extrapolates the next and the previous value of all histories (rows of equal length) at once.
+    The difference levels are built with np.diff along the rows, histories whose level only
+    contains zeros are dropped from the following levels. The next value is the sum of the last
+    values of all levels, the previous value the alternating sum of the first values
+    """
+    next_values = np.zeros(len(histories), dtype=np.int64)
+    previous_values = np.zeros(len(histories), dtype=np.int64)
+    active_rows = np.arange(len(histories))
+    level = histories
+    sign = 1
+
+    while level.shape[1] > 0 and len(active_rows) > 0:
+        next_values[active_rows] += level[:, -1]
+        previous_values[active_rows] += sign * level[:, 0]
+
+        not_converged = np.any(level != 0, axis=1)
+        level = np.diff(level[not_converged], axis=1)
+        active_rows = active_rows[not_converged]
+        sign = -sign
+
+    return next_values, previous_values
+
+@lru_cache(maxsize=None)
+def extrapolation_weights(length: int, position: int) -> tuple[int, ...]:
+    """
+    Returns the Lagrange weights w_j with value(position) = sum_j w_j * sequence[j] for every
+    sequence of the given length. Extrapolating the difference pyramid is the same as evaluating
+    the interpolation polynomial of degree < length, whose weights at integer positions are
+    integers: w_j = prod_{m != j} (position - m) / prod_{m != j} (j - m)
+    Position 0 is the first value of a sequence, so position length is the next and -1 the previous value
+    """
+    prefix_products = [1]
+    for m in range(length - 1):
+        prefix_products.append(prefix_products[-1] * (position - m))
+    suffix_products = [1]
+    for m in range(length - 1, 0, -1):
+        suffix_products.append(suffix_products[-1] * (position - m))
+    suffix_products.reverse()
+
+    return tuple(prefix_products[j] * suffix_products[j]
+                 // ((-1)**(length - 1 - j) * math.factorial(j) * math.factorial(length - 1 - j))
+                 for j in range(length))
+
+def extrapolate(histories: np.ndarray, position: int) -> np.ndarray:
+    """
+    Extrapolates the value at the given position for all histories (rows of equal length) with a
+    single matrix-vector product with the cached weights. Falls back to exact python integers if the
+    result could overflow int64
+
+    :param histories: 2D array with one history per row
+    :param position: position to extrapolate to, e.g. length - 1 + k for k steps ahead or -k for k steps behind
+    """
+    weights = extrapolation_weights(histories.shape[1], position)
+    max_abs_result = max(abs(weight) for weight in weights) * int(np.abs(histories).max(initial=0)) * len(weights)
+    if max_abs_result < 2**63:
+        return histories @ np.array(weights, dtype=np.int64)
+    return histories.astype(object) @ np.array(weights, dtype=object)
+
 if __name__ == "__main__":
     sum_pred_next_values = 0
     sum_pred_previous_values = 0
@@ -47,4 +155,20 @@ if __name__ == "__main__":
             sum_pred_previous_values += history_analyser.predict_previous_value()
 
     print(f"Part 1 Result: {sum_pred_next_values}")
-    print(f"Part 2 Result: {sum_pred_previous_values}")
\ No newline at end of file
+    print(f"Part 2 Result: {sum_pred_previous_values}")
+
+    with open("input.txt") as fp:
+        histories_by_length = load_histories_by_length(fp.readlines())
+    batch_predictions = [predict_next_and_previous_values(histories) for histories in histories_by_length.values()]
+    print(f"Part 1 Result (batch): {sum(next_values.sum() for next_values, _ in batch_predictions)}")
+    print(f"Part 2 Result (batch): {sum(previous_values.sum() for _, previous_values in batch_predictions)}")
+    with open("input.txt") as fp:
+        sum_incremental_next_values = 0
+        for line in fp:
+            incremental_analyser = IncrementalHistoryAnalyser()
+            for value in line.split():
+                incremental_analyser.append(int(value))
+            sum_incremental_next_values += incremental_analyser.predict_next_value()
+    print(f"Part 1 Result (incremental): {sum_incremental_next_values}")
+    print(f"Part 1 Result (weights): {sum(extrapolate(histories, length).sum() for length, histories in histories_by_length.items())}")
+    print(f"Part 2 Result (weights): {sum(extrapolate(histories, -1).sum() for histories in histories_by_length.values())}")
\ No newline at end of file
@@ -1,6 +1,40 @@
 from enum import Enum
 import numpy as np
 
+# compact tile encoding: the int8 code of a tile is its index in TILE_CHARS
+TILE_CHARS = ".|-LJ7FS"
+
+# directions are encoded as 0 = top, 1 = right, 2 = bot, 3 = left
+ROW_CHANGE = [-1, 0, 1, 0]
+COL_CHANGE = [0, 1, 0, -1]
+# bitmask of the directions each tile code connects to
+CONNECTIONS = [0, 0b0101, 0b1010, 0b0011, 0b1001, 0b1100, 0b0110, 0]
+
+
+def build_tile_tables() -> tuple[np.ndarray, list[list[int]]]:
+    """
+    Builds the lookup table from raw input byte to tile code and the successor table
+    NEXT_DIRECTION, where NEXT_DIRECTION[code][direction] is the direction to continue in after
+    entering a tile with the given code while travelling in direction (-1 if the tile cannot be
+    entered that way)
+    """
+    byte_to_code = np.zeros(256, dtype=np.int8)
+    for code, char in enumerate(TILE_CHARS):
+        byte_to_code[ord(char)] = code
+
+    next_direction = [[-1] * 4 for _ in CONNECTIONS]
+    for code, connections in enumerate(CONNECTIONS):
+        for direction in range(4):
+            entry = (direction + 2) % 4
+            if connections >> entry & 1:
+                next_direction[code][direction] = (connections & ~(1 << entry)).bit_length() - 1
+
+    return byte_to_code, next_direction
+
+
+BYTE_TO_CODE, NEXT_DIRECTION = build_tile_tables()
+
+
 class PipeMap():
 
     char_to_pipe = {
@@ -30,6 +64,7 @@ class PipeMap():
         self.map = np.array(map)
         self.start = start_point
         self.loop_map = np.zeros_like(self.map, dtype=bool)
+        self.loop_positions: list[tuple[int, int]] = []
 
     def get_valid_next_directions(self, tile_position: tuple[int, int]) -> list[str]:
         """
@@ -75,8 +110,10 @@ class PipeMap():
         pos = (self.start[0] + idx_plus[0], self.start[1] + idx_plus[1])
         self.loop_map[self.start] = True
         self.loop_map[pos] = True
+        self.loop_positions = [self.start]
 
         while pos != self.start:
+            self.loop_positions.append(pos)
             pipe = self.char_to_pipe[self.map[pos[0]][pos[1]]]
 
             if pipe[0] != self.opposites[last_direction]:
@@ -136,6 +173,124 @@ class PipeMap():
         
         return sum(self.is_tile_inside_loop(point) for point in points_to_test)
 
+    def calculate_num_tiles_inside_loop_scanline(self) -> int:
+        """
+        Returns the number of tiles in this PipeMap that are enclosed in its loop
+        by scanning all rows at once. A ray along a row crosses the loop at every loop
+        tile that connects to the top ("|", "L", "J"), so the running count of these
+        crossings (a cumulative sum along the rows) is odd exactly inside the loop
+        """
+        crossings = self.loop_map & np.isin(self.map, ["|", "L", "J"])
+        is_inside = np.cumsum(crossings, axis=1) % 2 == 1
+        return int(np.count_nonzero(is_inside & ~self.loop_map))
+
+    def calculate_num_tiles_inside_loop_pick(self) -> int:
+        """
+        Returns the number of tiles in this PipeMap that are enclosed in its loop
+        by calculating the area of the loop polygon with the shoelace formula and
+        applying Pick's theorem: area = inside + boundary / 2 - 1
+        """
+        rows = np.array([pos[0] for pos in self.loop_positions], dtype=np.int64)
+        cols = np.array([pos[1] for pos in self.loop_positions], dtype=np.int64)
+        double_area = abs(int(np.sum(rows * np.roll(cols, -1) - np.roll(rows, -1) * cols)))
+        return (double_area - len(self.loop_positions)) // 2 + 1
+
+
+def load_tile_codes(path: str, block_size: int = 1 << 24) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Memory maps the raw maze file and converts it into a 2D int8 array of tile codes without
+    creating python objects per tile. Returns the tile codes and the start position
+
+    :param path: path of the maze file (lines may end with "\\n" or "\\r\\n")
+    :param block_size: number of bytes scanned at once while counting the lines
+    """
+    with open(path, "rb") as fp:
+        first_line = fp.readline()
+    width = len(first_line.rstrip(b"\r\n"))
+    line_stride = len(first_line)
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+    num_newlines = sum(int(np.count_nonzero(raw[block_start:block_start + block_size] == ord("\n")))
+                       for block_start in range(0, len(raw), block_size))
+    height = num_newlines + (raw[-1] != ord("\n"))
+    if len(raw) < (height - 1) * line_stride + width:
+        raise ValueError(f"The lines of {path} do not all have the same length")
+
+    # view the rows without their line endings, this also works without a trailing newline
+    rows = np.lib.stride_tricks.as_strided(raw, shape=(height, width), strides=(line_stride, 1))
+    tile_codes = BYTE_TO_CODE[rows]
+
+    start_positions = np.argwhere(tile_codes == TILE_CHARS.index("S"))
+    if len(start_positions) == 0:
+        raise ValueError(f"{path} does not contain a start tile S")
+    return tile_codes, (int(start_positions[0][0]), int(start_positions[0][1]))
+
+
+class CompactPipeMap():
+
+    def __init__(self, tile_codes: np.ndarray, start_point: tuple[int, int]) -> None:
+        self.tile_codes = tile_codes
+        self.start = start_point
+        self.loop_map = np.zeros(tile_codes.shape, dtype=bool)
+        self.loop_length = 0
+
+    def resolve_start_code(self) -> int:
+        """
+        Returns the code of the pipe under the start tile, which is the pipe connecting
+        all neighbors that connect back to the start
+        """
+        height, width = self.tile_codes.shape
+        connections = 0
+        for direction in range(4):
+            row, col = self.start[0] + ROW_CHANGE[direction], self.start[1] + COL_CHANGE[direction]
+            if 0 <= row < height and 0 <= col < width:
+                if CONNECTIONS[self.tile_codes[row, col]] >> ((direction + 2) % 4) & 1:
+                    connections |= 1 << direction
+        if bin(connections).count("1") != 2:
+            raise ValueError(f"The start tile {self.start} does not connect to exactly two pipes")
+        return CONNECTIONS.index(connections)
+
+    def initialize_loop(self) -> None:
+        """
+        Follows the loop from start to start using only integer table lookups on the flat
+        tile codes and marks all loop tiles in loop_map. The start tile is replaced by its pipe code
+        """
+        height, width = self.tile_codes.shape
+        start_code = self.resolve_start_code()
+        self.tile_codes[self.start] = start_code
+
+        flat_codes = memoryview(self.tile_codes.reshape(-1))
+        is_loop = bytearray(height * width)
+
+        direction = next(out for out in range(4) if CONNECTIONS[start_code] >> out & 1)
+        row, col = self.start
+        loop_length = 0
+        while True:
+            is_loop[row * width + col] = 1
+            row += ROW_CHANGE[direction]
+            col += COL_CHANGE[direction]
+            if not (0 <= row < height and 0 <= col < width):
+                raise ValueError(f"The loop leaves the maze at ({row}, {col})")
+            loop_length += 1
+            if (row, col) == self.start:
+                break
+            direction = NEXT_DIRECTION[flat_codes[row * width + col]][direction]
+            if direction < 0:
+                raise ValueError(f"The loop is broken at ({row}, {col})")
+
+        self.loop_map = np.frombuffer(is_loop, dtype=bool).reshape(height, width)
+        self.loop_length = loop_length
+
+    def calculate_num_tiles_inside_loop_scanline(self) -> int:
+        """
+        Returns the number of tiles enclosed in the loop like
+        PipeMap.calculate_num_tiles_inside_loop_scanline, but on the tile codes
+        """
+        crossing_codes = [TILE_CHARS.index(char) for char in "|LJ"]
+        crossings = self.loop_map & np.isin(self.tile_codes, crossing_codes)
+        is_inside = np.cumsum(crossings, axis=1) % 2 == 1
+        return int(np.count_nonzero(is_inside & ~self.loop_map))
+
 
 if __name__ == "__main__":
     map = []
@@ -152,3 +307,11 @@ if __name__ == "__main__":
         loop = map.initialize_loop()
         print(f"Part 1 Result: {(np.count_nonzero(map.loop_map)) // 2}")
         print(f"Part 2 Result: {map.calculate_num_tiles_inside_loop()}")
+        print(f"Part 2 Result (scanline): {map.calculate_num_tiles_inside_loop_scanline()}")
+        print(f"Part 2 Result (pick): {map.calculate_num_tiles_inside_loop_pick()}")
+
+    tile_codes, start_point = load_tile_codes("input.txt")
+    compact_map = CompactPipeMap(tile_codes, start_point)
+    compact_map.initialize_loop()
+    print(f"Part 1 Result (compact): {compact_map.loop_length // 2}")
+    print(f"Part 2 Result (compact): {compact_map.calculate_num_tiles_inside_loop_scanline()}")